@@ -1,19 +1,23 @@
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import StreamingResponse, HTMLResponse, RedirectResponse
+from fastapi.responses import Response, StreamingResponse, HTMLResponse, RedirectResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from starlette.background import BackgroundTask
+from contextlib import asynccontextmanager
 import httpx
+import orjson
+import asyncio
 import re
+import time
 from typing import Optional
-from urllib.parse import urljoin, urlparse
 import logging
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 HOST = os.getenv("HOST", "0.0.0.0")
@@ -21,112 +25,317 @@ PORT = int(os.getenv("PORT", "8000"))
 BASE_DOMAIN = os.getenv("BASE_DOMAIN", "http://localhost:8000")
 BASE_PATH = os.getenv("BASE_PATH", "")
 
+# Fixed URL prefixes; proxy URLs are built by plain concatenation onto these
+PROXY_PREFIX = f"{BASE_DOMAIN}{BASE_PATH}/"
+IMAGE_URL_PREFIX = f"{PROXY_PREFIX}i/"
+
+# Proxy route prefix for each content type returned by extract_imgur_id; plain images use none
+_REDIRECT_PATHS = {
+    'direct': 'i/',
+    'album': 'a/',
+}
+
+# Headers shared by every upstream request; handlers add their own on top
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:144.0) Gecko/20100101 Firefox/144.0',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Referer': 'https://imgur.com/',
+}
+
+# Per-endpoint header overrides, merged over DEFAULT_HEADERS by the client.
+# Image bodies are relayed undecoded, so ask for them unencoded: the downstream
+# client may not accept whatever encoding DEFAULT_HEADERS would allow
+IMAGE_HEADERS = {
+    'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
+    'Accept-Encoding': 'identity',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'DNT': '1',
+    'Sec-Fetch-Dest': 'image',
+    'Sec-Fetch-Mode': 'no-cors',
+    'Sec-Fetch-Site': 'cross-site',
+}
+
+ALBUM_API_HEADERS = {
+    'Accept': '*/*',
+    'Accept-Language': 'en-GB,en;q=0.5',
+    'Origin': 'https://imgur.com',
+    'DNT': '1',
+    'Sec-Fetch-Dest': 'empty',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'same-site',
+}
+
+MEDIA_API_HEADERS = {
+    'Accept': '*/*',
+    'Accept-Language': 'en-GB,en;q=0.5',
+    'Origin': 'https://imgur.com',
+}
+
+# Client headers passed upstream so Imgur can answer with 304 or 206 itself
+_FORWARDED_REQUEST_HEADERS = ("if-none-match", "if-modified-since", "range", "if-range")
+
+# Upstream answers to the forwarded headers that are relayed as-is rather than treated as errors
+_PASSTHROUGH_STATUSES = (304, 416)
+
+# Upstream image headers passed back to the client. Raw bytes are forwarded as-is,
+# so the upstream length (and encoding, should Imgur ignore 'identity') still apply
+_FORWARDED_RESPONSE_HEADERS = (
+    "content-length", "content-encoding", "content-range", "accept-ranges", "etag", "last-modified"
+)
+
+# Headers set on every proxied image response
+IMAGE_RESPONSE_HEADERS = {
+    "Cache-Control": "public, max-age=86400",
+    "Access-Control-Allow-Origin": "*"
+}
+
+# Extensions tried on i.imgur.com when the media API has no record of an ID
+FALLBACK_EXTENSIONS = ('jpg', 'png', 'gif', 'jpeg', 'webp')
+
+# Query string for api.imgur.com post lookups; the media payload carries each file's ext
+API_PARAMS = {
+    'client_id': 'cf37933da20ab71',
+    'include': 'media'
+}
+
+# In-process TTL caches: {key: (expires_at, value)}
+# API payloads are keyed by API URL, rendered pages by template and ID,
+# extension probes by ID ('' records a miss)
+CACHE_TTL = 300.0
+_ALBUM_CACHE: dict[str, tuple[float, dict]] = {}
+_MEDIA_CACHE: dict[str, tuple[float, dict]] = {}
+_PAGE_CACHE: dict[str, tuple[float, bytes]] = {}
+_PROBE_CACHE: dict[str, tuple[float, str]] = {}
+_ALBUM_CACHE_SIZE = 1024
+_MEDIA_CACHE_SIZE = 4096
+_PAGE_CACHE_SIZE = 512
+_PROBE_CACHE_SIZE = 4096
+_inflight: dict[str, asyncio.Task] = {}
+
+# One pooled HTTP/2 client per process so upstream requests share kept-alive connections
+CLIENT = httpx.AsyncClient(
+    timeout=30.0,
+    http2=True,
+    follow_redirects=True,
+    limits=httpx.Limits(max_keepalive_connections=100, max_connections=200, keepalive_expiry=60.0),
+    headers=DEFAULT_HEADERS
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await CLIENT.aclose()
+
 app = FastAPI(
     title="Imgur Proxy",
     description="Access Imgur content from anywhere",
-    root_path=BASE_PATH or None
+    root_path=BASE_PATH or None,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 templates = Jinja2Templates(directory="templates")
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-IMGUR_PATTERNS = [
-    r'imgur\.com/([a-zA-Z0-9]+)',
-    r'i\.imgur\.com/([a-zA-Z0-9]+\.\w+)',
-]
+# Compiled once at import so the request path skips the re module's cache lookup
+_ALBUM_DASH_RE = re.compile(r'/a/(?:.*-)?([a-zA-Z0-9]{7})(?:[/?#]|$)')
+_ALBUM_SHORT_RE = re.compile(r'/a/([a-zA-Z0-9]{5,7})(?:[/?#]|$)')
+_GALLERY_DASH_RE = re.compile(r'/gallery/(?:.*-)?([a-zA-Z0-9]{7})(?:[/?#]|$)')
+_GALLERY_SHORT_RE = re.compile(r'/gallery/([a-zA-Z0-9]{5,7})(?:[/?#]|$)')
+_DIRECT_RE = re.compile(r'i\.imgur\.com/([a-zA-Z0-9]+\.\w+)')
+_PATH_RE = re.compile(r'imgur\.com/(.+)')
+_ID_SUFFIX_RE = re.compile(r'([a-zA-Z0-9]{5,7})$')
+_VALID_ID_RE = re.compile(r'[a-zA-Z0-9]{5,8}(?:\.[a-zA-Z0-9]{3,4})?\Z')
 
 # SSRF Protection: Whitelist of allowed domains
-ALLOWED_IMGUR_DOMAINS = {
+ALLOWED_IMGUR_DOMAINS = frozenset({
     'imgur.com',
     'i.imgur.com',
     'www.imgur.com',
     'api.imgur.com'
-}
+})
+
+def _fast_host(url: str) -> Optional[tuple[str, str]]:
+    """Split an absolute URL into (scheme, authority) without a full urlparse"""
+    i = url.find('://')
+    if i not in (4, 5):
+        return None
+    rest = url[i + 3:]
+    end = len(rest)
+    for sep in '/?#':
+        j = rest.find(sep, 0, end)
+        if j >= 0:
+            end = j
+    return url[:i].lower(), rest[:end].lower()
 
 def validate_imgur_url(url: str) -> bool:
     """
     Strictly validate that URL is from Imgur to prevent SSRF attacks.
     Returns True only if the URL is from an allowed Imgur domain.
     """
-    try:
-        parsed = urlparse(url)
-        
-        if parsed.scheme not in ['http', 'https']:
-            logger.warning(f"Invalid scheme in URL: {url}")
-            return False
-        
-        if parsed.netloc not in ALLOWED_IMGUR_DOMAINS:
-            logger.warning(f"Domain not in whitelist: {parsed.netloc}")
-            return False
-        
-        if parsed.username or parsed.password:
-            logger.warning(f"URL contains credentials: {url}")
-            return False
-        
-        return True
-    except Exception as e:
-        logger.error(f"Error parsing URL {url}: {e}")
+    parts = _fast_host(url)
+    
+    if parts is None or parts[0] not in ('http', 'https'):
+        logger.warning("Invalid scheme in URL: %s", url)
+        return False
+    
+    host = parts[1]
+    
+    if '@' in host:
+        logger.warning("URL contains credentials: %s", url)
+        return False
+    
+    # Exact match, so hosts with an explicit port are rejected as before
+    if host not in ALLOWED_IMGUR_DOMAINS:
+        logger.warning("Domain not in whitelist: %s", host)
         return False
+    
+    return True
 
 def extract_imgur_id(url: str) -> Optional[tuple[str, str]]:
     """Extract Imgur ID and type from URL"""
-    if not validate_imgur_url(url):
-        logger.warning(f"URL failed validation: {url}")
+    # Cheap substring test first so obviously foreign URLs skip validation and regex
+    if 'imgur.com' not in url or not validate_imgur_url(url):
+        logger.warning("URL failed validation: %s", url)
         return None
     
     if '/a/' in url:
-        album_match = re.search(r'/a/(?:.*-)?([a-zA-Z0-9]{7})(?:[/?#]|$)', url)
+        album_match = _ALBUM_DASH_RE.search(url)
         if album_match:
             return ('album', album_match.group(1))
-        album_match = re.search(r'/a/([a-zA-Z0-9]{5,7})(?:[/?#]|$)', url)
+        album_match = _ALBUM_SHORT_RE.search(url)
         if album_match:
             return ('album', album_match.group(1))
     
     if '/gallery/' in url:
-        gallery_match = re.search(r'/gallery/(?:.*-)?([a-zA-Z0-9]{7})(?:[/?#]|$)', url)
+        gallery_match = _GALLERY_DASH_RE.search(url)
         if gallery_match:
             return ('album', gallery_match.group(1)) 
-        gallery_match = re.search(r'/gallery/([a-zA-Z0-9]{5,7})(?:[/?#]|$)', url)
+        gallery_match = _GALLERY_SHORT_RE.search(url)
         if gallery_match:
             return ('album', gallery_match.group(1))
     
     if 'i.imgur.com' in url:
-        direct_match = re.search(r'i\.imgur\.com/([a-zA-Z0-9]+\.\w+)', url)
+        direct_match = _DIRECT_RE.search(url)
         if direct_match:
             return ('direct', direct_match.group(1))
     
-    if 'imgur.com/' in url:
-        path_match = re.search(r'imgur\.com/(.+)', url)
-        if path_match:
-            path = path_match.group(1).split('?')[0].split('#')[0]
-            id_match = re.search(r'([a-zA-Z0-9]{5,7})$', path)
-            if id_match:
-                return ('image', id_match.group(1))
+    path_match = _PATH_RE.search(url)
+    if path_match:
+        path = path_match.group(1).partition('?')[0].partition('#')[0]
+        id_match = _ID_SUFFIX_RE.search(path)
+        if id_match:
+            return ('image', id_match.group(1))
     
     return None
 
-def get_proxy_url(path: str) -> str:
-    """Build full proxy URL using BASE_DOMAIN + BASE_PATH"""
-    return urljoin(f"{BASE_DOMAIN}{BASE_PATH}/", path.lstrip("/"))
+def _media_description(media: dict) -> str:
+    """Caption for an album entry: its description, else its title, else its name"""
+    metadata = media.get('metadata') or {}
+    return metadata.get('description') or metadata.get('title') or media.get('name') or ''
 
 def validate_imgur_id(imgur_id: str) -> bool:
     """
     Validate Imgur ID format to prevent path traversal or malicious input.
     Imgur IDs are alphanumeric, typically 5-7 characters.
     """
-    # Allow alphanumeric IDs (7 chars) and filenames with extensions
-    if not re.match(r'^[a-zA-Z0-9]{5,8}(\.[a-zA-Z0-9]{3,4})?$', imgur_id):
-        logger.warning(f"Invalid Imgur ID format: {imgur_id}")
-        return False
-    
-    # Prevent path traversal attempts
-    if '..' in imgur_id or '/' in imgur_id or '\\' in imgur_id:
-        logger.warning(f"Path traversal attempt detected: {imgur_id}")
+    # Allow alphanumeric IDs (7 chars) and filenames with extensions.
+    # The anchored pattern already rules out '..', '/' and '\\', so no separate traversal check.
+    if _VALID_ID_RE.match(imgur_id) is None:
+        logger.warning("Invalid Imgur ID format: %s", imgur_id)
         return False
     
     return True
 
+def _cache_get(cache: dict, key: str):
+    """Return the cached value for key, or None if missing or expired"""
+    entry = cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+def _cache_store(cache: dict, maxsize: int, key: str, data) -> None:
+    """Store a value, evicting the oldest entries when the cache is full"""
+    # Re-inserting moves the key to the end, so dict order stays insertion (FIFO) order.
+    # With one TTL for every entry that is also expiry order: the oldest entry is the
+    # first to expire, so evicting from the front never needs a scan for stale keys
+    cache.pop(key, None)
+    while len(cache) >= maxsize:
+        del cache[next(iter(cache))]
+    cache[key] = (time.monotonic() + CACHE_TTL, data)
+
+def _consume_exception(task: asyncio.Task) -> None:
+    """Done callback marking a task's exception as retrieved, for tasks nobody may await"""
+    if not task.cancelled():
+        task.exception()
+
+async def _load_api_json(api_url: str, headers: dict, cache: dict, maxsize: int) -> dict:
+    response = await CLIENT.get(api_url, params=API_PARAMS, headers=headers)
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    _cache_store(cache, maxsize, api_url, data)
+    return data
+
+async def fetch_api_json(api_url: str, headers: dict, cache: dict, maxsize: int) -> dict:
+    """
+    Fetch an Imgur API payload, serving repeats from the TTL cache.
+    Concurrent misses for the same URL share a single upstream request.
+    """
+    data = _cache_get(cache, api_url)
+    if data is not None:
+        return data
+    
+    task = _inflight.get(api_url)
+    if task is None:
+        task = asyncio.ensure_future(_load_api_json(api_url, headers, cache, maxsize))
+        _inflight[api_url] = task
+        task.add_done_callback(lambda _: _inflight.pop(api_url, None))
+        # Every waiter may be cancelled before the fetch fails
+        task.add_done_callback(_consume_exception)
+    
+    # Shielded so one cancelled caller does not abort the fetch for the others
+    return await asyncio.shield(task)
+
+async def probe_image_ext(imgur_id: str) -> Optional[str]:
+    """
+    Find an extension i.imgur.com serves for this ID, probing all candidates concurrently.
+    Returns the first one answering 200 and cancels the rest. Hits and misses are cached.
+    """
+    cached = _cache_get(_PROBE_CACHE, imgur_id)
+    if cached is not None:
+        return cached or None
+    
+    async def try_ext(ext: str) -> Optional[str]:
+        # Missing images redirect to removed.png, so redirects must not count as a hit
+        response = await CLIENT.head(f"https://i.imgur.com/{imgur_id}.{ext}", headers=IMAGE_HEADERS, follow_redirects=False)
+        return ext if response.status_code == 200 else None
+    
+    tasks = [asyncio.ensure_future(try_ext(ext)) for ext in FALLBACK_EXTENSIONS]
+    for task in tasks:
+        # Probes still running when a hit returns are never awaited
+        task.add_done_callback(_consume_exception)
+    found = None
+    failed = False
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                ext = await next_done
+            except httpx.HTTPError:
+                failed = True
+                continue
+            if ext:
+                found = ext
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+    
+    # A miss is only cached when every probe got a real answer, not a network error
+    if found or not failed:
+        _cache_store(_PROBE_CACHE, _PROBE_CACHE_SIZE, imgur_id, found or '')
+    return found
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Landing page"""
@@ -146,203 +355,188 @@ async def proxy_url(url: str):
     
     content_type, imgur_id = result
     
-    logger.info(f"Extracted ID: {imgur_id} from URL: {url}")
+    logger.info("Extracted ID: %s from URL: %s", imgur_id, url)
     
-    if content_type == 'direct':
-        redirect_target = get_proxy_url(f"i/{imgur_id}")
-    elif content_type == 'album':
-        redirect_target = get_proxy_url(f"a/{imgur_id}")
-    else:
-        redirect_target = get_proxy_url(f"{imgur_id}")
+    redirect_target = PROXY_PREFIX + _REDIRECT_PATHS.get(content_type, '') + imgur_id
 
     return RedirectResponse(url=redirect_target)
 
 @app.get("/a/{album_id}", response_class=HTMLResponse)
 async def serve_album(album_id: str, request: Request):
     """Serve Imgur album as a gallery"""
-    logger.info(f"Attempting to serve album with ID: {album_id}")
+    logger.info("Attempting to serve album with ID: %s", album_id)
     
     if not validate_imgur_id(album_id):
         raise HTTPException(status_code=400, detail="Invalid album ID format")
     
+    page_key = f"album.html:{album_id}"
+    cached_page = _cache_get(_PAGE_CACHE, page_key)
+    if cached_page is not None:
+        return HTMLResponse(content=cached_page)
+    
     api_url = f"https://api.imgur.com/post/v1/albums/{album_id}"
-    params = {
-        'client_id': 'cf37933da20ab71',
-        'include': 'media'
-    }
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:144.0) Gecko/20100101 Firefox/144.0',
-        'Accept': '*/*',
-        'Accept-Language': 'en-GB,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Referer': 'https://imgur.com/',
-        'Origin': 'https://imgur.com',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Sec-Fetch-Dest': 'empty',
-        'Sec-Fetch-Mode': 'cors',
-        'Sec-Fetch-Site': 'same-site',
-    }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0, headers=headers) as client:
-            response = await client.get(api_url, params=params)
-            response.raise_for_status()
-            
-            album_data = response.json()
-            
-            images = []
-            for media in album_data.get('media', []):
-                image_id = media['id']
-                
-                metadata = media.get('metadata', {})
-                description = metadata.get('description', '') or metadata.get('title', '') or media.get('name', '')
-                
-                images.append({
-                    'id': image_id,
-                    'url': get_proxy_url(f"i/{image_id}.{media['ext']}"),
-                    'width': media.get('width', 0),
-                    'height': media.get('height', 0),
-                    'name': description,
-                    'description': description,
-                    'mime_type': media.get('mime_type', 'image/jpeg')
-                })
-            
-            if not images:
-                raise HTTPException(status_code=404, detail="Album is empty or not found")
-            
-            return templates.TemplateResponse("album.html", {
-                "request": request,
-                "album_id": album_id,
-                "title": album_data.get('title', 'Imgur Album'),
-                "description": album_data.get('description', ''),
-                "image_count": len(images),
-                "images": images,
-                "base_domain": BASE_DOMAIN,
-                "base_path": BASE_PATH
-            })
-            
+        album_data = await fetch_api_json(api_url, ALBUM_API_HEADERS, _ALBUM_CACHE, _ALBUM_CACHE_SIZE)
+        
+        images = [
+            {
+                'id': media['id'],
+                'url': f"{IMAGE_URL_PREFIX}{media['id']}.{media['ext']}",
+                'width': media.get('width', 0),
+                'height': media.get('height', 0),
+                'name': (description := _media_description(media)),
+                'description': description,
+                'mime_type': media.get('mime_type', 'image/jpeg')
+            }
+            for media in album_data.get('media') or []
+        ]
+        
+        if not images:
+            raise HTTPException(status_code=404, detail="Album is empty or not found")
+        
+        response = templates.TemplateResponse("album.html", {
+            "request": request,
+            "album_id": album_id,
+            "title": album_data.get('title', 'Imgur Album'),
+            "description": album_data.get('description', ''),
+            "image_count": len(images),
+            "images": images,
+            "base_domain": BASE_DOMAIN,
+            "base_path": BASE_PATH
+        })
+        _cache_store(_PAGE_CACHE, _PAGE_CACHE_SIZE, page_key, response.body)
+        return response
+        
     except httpx.HTTPError as e:
-        logger.error(f"Error fetching album {album_id}: {e}")
+        logger.error("Error fetching album %s: %s", album_id, e)
         raise HTTPException(status_code=404, detail="Album not found")
     except Exception as e:
-        logger.error(f"Error processing album {album_id}: {e}")
+        logger.error("Error processing album %s: %s", album_id, e)
         raise HTTPException(status_code=500, detail="Error processing album")
 
 @app.get("/i/{filename}")
-async def serve_direct_image(filename: str):
+async def serve_direct_image(filename: str, request: Request):
     """Serve images from i.imgur.com directly"""
     if not validate_imgur_id(filename):
         raise HTTPException(status_code=400, detail="Invalid filename format")
     
     imgur_url = f"https://i.imgur.com/{filename}"
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:144.0) Gecko/20100101 Firefox/144.0',
-        'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Referer': 'https://imgur.com/',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Sec-Fetch-Dest': 'image',
-        'Sec-Fetch-Mode': 'no-cors',
-        'Sec-Fetch-Site': 'cross-site',
-    }
+    headers = IMAGE_HEADERS
+    client_headers = {name: request.headers[name] for name in _FORWARDED_REQUEST_HEADERS if name in request.headers}
+    if client_headers:
+        headers = {**IMAGE_HEADERS, **client_headers}
     
+    response = None
     try:
-        async with httpx.AsyncClient(timeout=30.0, headers=headers, follow_redirects=True) as client:
-            response = await client.get(imgur_url)
+        # Only the headers are read here; the body is relayed chunk by chunk below
+        response = await CLIENT.send(CLIENT.build_request("GET", imgur_url, headers=headers), stream=True)
+        if response.status_code not in _PASSTHROUGH_STATUSES:
             response.raise_for_status()
-            
-            content_type = response.headers.get("content-type", "image/jpeg")
-            
-            return StreamingResponse(
-                iter([response.content]),
-                media_type=content_type,
-                headers={
-                    "Cache-Control": "public, max-age=86400",
-                    "Access-Control-Allow-Origin": "*"
-                }
-            )
+        logger.debug("Fetched %s over %s", imgur_url, response.http_version)
     except httpx.HTTPError as e:
-        logger.error(f"Error fetching {imgur_url}: {e}")
+        if response is not None:
+            await response.aclose()
+        logger.error("Error fetching %s: %s", imgur_url, e)
         raise HTTPException(status_code=404, detail="Image not found")
+    
+    out_headers = {**IMAGE_RESPONSE_HEADERS}
+    for name in _FORWARDED_RESPONSE_HEADERS:
+        if name in response.headers:
+            out_headers[name] = response.headers[name]
+    
+    if response.status_code in _PASSTHROUGH_STATUSES:
+        # Not Modified or Range Not Satisfiable: answered without a body (or body length),
+        # keeping the validators and, for 416, the upstream Content-Range
+        await response.aclose()
+        out_headers.pop("content-length", None)
+        out_headers.pop("content-encoding", None)
+        return Response(status_code=response.status_code, headers=out_headers)
+    
+    content_type = response.headers.get("content-type", "image/jpeg")
+    
+    return StreamingResponse(
+        response.aiter_raw(65536),
+        status_code=response.status_code,
+        media_type=content_type,
+        headers=out_headers,
+        background=BackgroundTask(response.aclose)
+    )
+
+# Registered before the /{imgur_id} catch-all, which would otherwise match "health"
+@app.get("/health")
+async def health_check():
+    """Health check endpoint"""
+    return {"status": "ok"}
 
 @app.get("/{imgur_id}", response_class=HTMLResponse)
 async def serve_image(imgur_id: str, request: Request):
     """Serve Imgur images by ID in image viewer"""
-    logger.info(f"Attempting to serve image with ID: {imgur_id}")
+    logger.info("Attempting to serve image with ID: %s", imgur_id)
     
     if not validate_imgur_id(imgur_id):
         raise HTTPException(status_code=400, detail="Invalid Imgur ID format")
     
+    page_key = f"image.html:{imgur_id}"
+    cached_page = _cache_get(_PAGE_CACHE, page_key)
+    if cached_page is not None:
+        return HTMLResponse(content=cached_page)
+
     api_url = f"https://api.imgur.com/post/v1/media/{imgur_id}"
-    params = {
-        'client_id': 'cf37933da20ab71',
-        'include': 'media'
-    }
-
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:144.0) Gecko/20100101 Firefox/144.0',
-        'Accept': '*/*',
-        'Accept-Language': 'en-GB,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Referer': 'https://imgur.com/',
-        'Origin': 'https://imgur.com',
-    }
 
     try:
-        async with httpx.AsyncClient(timeout=30.0, headers=headers) as client:
-            response = await client.get(api_url, params=params)
-            response.raise_for_status()
-            media_data = response.json()
-
-            media_list = media_data.get("media", [])
-            if not media_list:
-                raise HTTPException(status_code=404, detail="No media found in response")
-
-            m = media_list[0]
-
-            image_id = m["id"]
-            ext = m.get("ext", "jpg")
-            mime_type = m.get("mime_type", "image/jpeg")
-            width = m.get("width", 0)
-            height = m.get("height", 0)
-            metadata = m.get("metadata", {})
-            title = metadata.get("title", "") or m.get("name", "") or f"{image_id}.{ext}"
-            description = metadata.get("description", "") or ""
-
-            image_url = get_proxy_url(f"i/{image_id}.{ext}")
-
-            return templates.TemplateResponse("image.html", {
-                "request": request,
-                "image_id": f"{image_id}.{ext}",
-                "image_url": image_url,
-                "title": title,
-                "description": description,
-                "width": width,
-                "height": height,
-                "mime_type": mime_type,
-                "base_domain": BASE_DOMAIN,
-                "base_path": BASE_PATH
-            })
+        media_data = await fetch_api_json(api_url, MEDIA_API_HEADERS, _MEDIA_CACHE, _MEDIA_CACHE_SIZE)
+
+        media_list = media_data.get("media", [])
+        if not media_list:
+            raise HTTPException(status_code=404, detail="No media found in response")
+
+        m = media_list[0]
+
+        image_id = m["id"]
+        ext = m.get("ext", "jpg")
+        mime_type = m.get("mime_type", "image/jpeg")
+        width = m.get("width", 0)
+        height = m.get("height", 0)
+        metadata = m.get("metadata", {})
+        title = metadata.get("title", "") or m.get("name", "") or f"{image_id}.{ext}"
+        description = metadata.get("description", "") or ""
+
+        image_url = f"{IMAGE_URL_PREFIX}{image_id}.{ext}"
+
+        response = templates.TemplateResponse("image.html", {
+            "request": request,
+            "image_id": f"{image_id}.{ext}",
+            "image_url": image_url,
+            "title": title,
+            "description": description,
+            "width": width,
+            "height": height,
+            "mime_type": mime_type,
+            "base_domain": BASE_DOMAIN,
+            "base_path": BASE_PATH
+        })
+        _cache_store(_PAGE_CACHE, _PAGE_CACHE_SIZE, page_key, response.body)
+        return response
 
     except httpx.HTTPError as e:
-        logger.error(f"Error fetching image {imgur_id}: {e}")
+        logger.error("Error fetching image %s: %s", imgur_id, e)
+        # Only an API 404 means the ID may still exist on i.imgur.com; rate limits,
+        # 5xx and timeouts must not fan out into more upstream requests
+        not_found = isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 404
+        ext = await probe_image_ext(imgur_id) if not_found and '.' not in imgur_id else None
+        if ext:
+            return RedirectResponse(url=f"{IMAGE_URL_PREFIX}{imgur_id}.{ext}")
         raise HTTPException(status_code=404, detail="Image not found")
     except Exception as e:
-        logger.error(f"Error processing image {imgur_id}: {e}")
+        logger.error("Error processing image %s: %s", imgur_id, e)
         raise HTTPException(status_code=500, detail="Error processing image")
 
-
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "ok"}
-
 if __name__ == "__main__":
     import uvicorn
-    logger.info(f"Starting server on {HOST}:{PORT}")
-    uvicorn.run(app, host=HOST, port=PORT)
\ No newline at end of file
+    logger.info("Starting server on %s:%s", HOST, PORT)
+    # The default "auto" loop/http settings already pick uvloop and httptools when installed.
+    # The access log is off to save per-request formatting; routes such as / and /i/{filename}
+    # then only log on errors
+    uvicorn.run(app, host=HOST, port=PORT, access_log=False)
\ No newline at end of file